@@ -11,6 +11,7 @@ import streamlit as st
 import functools
 import time
 import os
+import sys
 from typing import Callable, Any, Dict, Optional
 from pathlib import Path
 
@@ -21,6 +22,12 @@ try:
 except ImportError:
     HAS_PSUTIL = False
 
+try:
+    import resource  # POSIX only
+    HAS_RESOURCE = True
+except ImportError:
+    HAS_RESOURCE = False
+
 # ====================
 # Performance Monitoring
 # ====================
@@ -28,6 +35,8 @@ except ImportError:
 class PerformanceMonitor:
     """Monitor and track performance metrics."""
     
+    __slots__ = ('metrics', 'start_times')
+    
     def __init__(self):
         self.metrics = {}
         self.start_times = {}
@@ -48,7 +57,7 @@ class PerformanceMonitor:
     def get_memory_usage(self) -> Dict[str, float]:
         """Get current memory usage statistics."""
         if not HAS_PSUTIL:
-            return {'rss_mb': 0, 'vms_mb': 0, 'percent': 0}
+            return self._get_peak_rss_usage()
         
         try:
             process = psutil.Process(os.getpid())
@@ -59,7 +68,18 @@ class PerformanceMonitor:
                 'percent': process.memory_percent()
             }
         except Exception:
+            return self._get_peak_rss_usage()
+    
+    @staticmethod
+    def _get_peak_rss_usage() -> Dict[str, float]:
+        """Peak RSS from getrusage() when psutil is unavailable (no VMS or percent)."""
+        if not HAS_RESOURCE:
             return {'rss_mb': 0, 'vms_mb': 0, 'percent': 0}
+        
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is kilobytes on Linux but bytes on macOS
+        rss_bytes = max_rss if sys.platform == 'darwin' else max_rss * 1024
+        return {'rss_mb': rss_bytes / 1024 / 1024, 'vms_mb': 0, 'percent': 0}
     
     def get_metrics(self) -> Dict[str, Any]:
         """Get all recorded metrics."""
@@ -131,6 +151,8 @@ def streamlit_cache_resource_with_metrics():
 class LazyLoader:
     """Lazy loading utility for heavy components."""
     
+    __slots__ = ('loader_func', 'cache_key', '_cached_result', '_loaded')
+    
     def __init__(self, loader_func: Callable, cache_key: Optional[str] = None):
         self.loader_func = loader_func
         self.cache_key = cache_key or loader_func.__name__
@@ -139,15 +161,16 @@ class LazyLoader:
     
     def load(self, *args, **kwargs) -> Any:
         """Load the component (only once)."""
-        if not self._loaded:
-            perf_monitor.start_timer(f"lazy_load_{self.cache_key}")
-            try:
-                self._cached_result = self.loader_func(*args, **kwargs)
-                self._loaded = True
-                perf_monitor.end_timer(f"lazy_load_{self.cache_key}")
-            except Exception as e:
-                perf_monitor.end_timer(f"lazy_load_{self.cache_key}")
-                raise e
+        if self._loaded:
+            return self._cached_result
+        
+        timer_name = f"lazy_load_{self.cache_key}"
+        perf_monitor.start_timer(timer_name)
+        try:
+            self._cached_result = self.loader_func(*args, **kwargs)
+            self._loaded = True
+        finally:
+            perf_monitor.end_timer(timer_name)
         return self._cached_result
     
     def is_loaded(self) -> bool:
@@ -166,6 +189,8 @@ class LazyLoader:
 class OptimizedSessionState:
     """Optimized session state management."""
     
+    __slots__ = ('_default_values', '_initialized_keys')
+    
     def __init__(self):
         self._default_values = {}
         self._initialized_keys = set()
@@ -200,7 +225,13 @@ session_manager = OptimizedSessionState()
 class CacheManager:
     """Advanced caching strategies for different data types."""
     
+    __slots__ = ()
+    
+    # Static data and the device probe cannot change within a process, so
+    # lru_cache answers reruns before Streamlit's cache lookup is reached.
+    # The returned dict is shared - treat it as read-only.
     @staticmethod
+    @functools.lru_cache(maxsize=1)
     @streamlit_cache_data_with_metrics(ttl=1800)  # 30 minutes
     def cache_model_info():
         """Cache model information."""
@@ -211,6 +242,7 @@ class CacheManager:
         }
     
     @staticmethod
+    @functools.lru_cache(maxsize=1)
     @streamlit_cache_data_with_metrics(ttl=300)  # 5 minutes
     def cache_device_detection():
         """Cache device detection results."""
@@ -241,6 +273,8 @@ class CacheManager:
 class MemoryManager:
     """Manage memory usage and cleanup."""
     
+    __slots__ = ()
+    
     @staticmethod
     def cleanup_large_objects():
         """Clean up large objects from session state."""
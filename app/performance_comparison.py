@@ -10,6 +10,9 @@ to demonstrate the improvements achieved through optimization.
 import time
 import os
 import sys
+import pickle
+import random
+import tempfile
 from typing import Dict, List, Any
 
 # Optional dependencies - handle gracefully if not available
@@ -192,37 +195,38 @@ from backend.music_variations import generate_variations, extend_music, batch_ge
         
         return results
     
-    def measure_cache_performance(self) -> Dict[str, float]:
-        """Measure cache hit/miss performance."""
+    def measure_cache_performance(self, num_keys: int = 10_000, num_lookups: int = 1000) -> Dict[str, float]:
+        """Measure in-memory cache lookups against reading the same entries from disk."""
         results = {}
         
-        # Simulate cache operations
-        cache_operations = 100
+        entry = {"model": "musicgen-small", "params": "300M"}
+        cache = {i: entry for i in range(num_keys)}
+        keys = random.Random(0).sample(range(num_keys), min(num_lookups, num_keys))
         
-        # Original: No caching
-        start_time = time.time()
-        for i in range(cache_operations):
-            # Simulate expensive operation
-            data = {"model": "musicgen-small", "params": "300M"}
-            time.sleep(0.001)  # Simulate processing time
-        original_time = time.time() - start_time
+        with tempfile.TemporaryDirectory(prefix="cache_bench_") as tmp_dir:
+            entry_file = os.path.join(tmp_dir, "model_info.pkl")
+            with open(entry_file, "wb") as f:
+                pickle.dump(entry, f)
+            
+            # Original: No caching - every lookup goes back to disk
+            start_ns = time.perf_counter_ns()
+            for _ in keys:
+                with open(entry_file, "rb") as f:
+                    data = pickle.load(f)
+            original_ns = time.perf_counter_ns() - start_ns
         
-        # Optimized: With caching
-        start_time = time.time()
-        cache = {}
-        for i in range(cache_operations):
-            key = "model_info_small"
-            if key in cache:
-                data = cache[key]  # Cache hit
-            else:
-                data = {"model": "musicgen-small", "params": "300M"}  # Cache miss
-                cache[key] = data
-            # No sleep needed for cache hits
-        optimized_time = time.time() - start_time
+        # Optimized: Lookups served from the in-memory cache
+        start_ns = time.perf_counter_ns()
+        for key in keys:
+            data = cache[key]
+        optimized_ns = time.perf_counter_ns() - start_ns
         
-        results["original"] = original_time
-        results["optimized"] = optimized_time
-        results["improvement"] = ((original_time - optimized_time) / original_time) * 100 if original_time > 0 else 0
+        results["original_ns"] = original_ns
+        results["optimized_ns"] = optimized_ns
+        results["original"] = original_ns / 1e9
+        results["optimized"] = optimized_ns / 1e9
+        results["speedup"] = original_ns / optimized_ns if optimized_ns > 0 else 0
+        results["improvement"] = ((original_ns - optimized_ns) / original_ns) * 100 if original_ns > 0 else 0
         
         return results
     
@@ -8,6 +8,8 @@ for music generation pipeline.
 """
 
 import os
+import functools
+import threading
 import numpy as np
 import librosa
 import soundfile as sf
@@ -15,13 +17,46 @@ import scipy.signal
 from scipy.ndimage import uniform_filter1d
 from pydub import AudioSegment
 from pydub.effects import normalize, compress_dynamic_range
-import matplotlib.pyplot as plt
-from sklearn.cluster import KMeans
 import warnings
 from pathlib import Path
 import json
 from typing import Dict, List, Tuple, Optional, Union, Any
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+# Optional dependencies - handle gracefully if not available
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+# Built once at import; _get_default_effects_config hands out copies
+_DEFAULT_EFFECTS_CONFIG = {
+    'noise_reduction': True,
+    'eq_adjustment': True,
+    'compression': True,
+    'reverb': False,
+    'delay': False,
+    'stereo_widening': False,
+    'limiter': True,
+    'mastering': True
+}
+
+
+# Per-thread plotting state (generate_spectrogram may run in several
+# Streamlit session threads at once)
+_plot_state = threading.local()
+
+
+@functools.lru_cache(maxsize=32)
+def _butter_sos(order: int, cutoff: Union[float, Tuple[float, float]],
+                btype: str, fs: int) -> np.ndarray:
+    """Design (once per parameter set) a Butterworth filter as second-order sections."""
+    sos = scipy.signal.butter(order, cutoff, btype=btype, fs=fs, output='sos')
+    sos.setflags(write=False)  # shared between callers
+    return sos
 
 
 class AudioProcessor:
@@ -72,16 +107,7 @@ class AudioProcessor:
     
     def _get_default_effects_config(self) -> Dict[str, Any]:
         """Get default effects configuration."""
-        return {
-            'noise_reduction': True,
-            'eq_adjustment': True,
-            'compression': True,
-            'reverb': False,
-            'delay': False,
-            'stereo_widening': False,
-            'limiter': True,
-            'mastering': True
-        }
+        return _DEFAULT_EFFECTS_CONFIG.copy()
     
     def _apply_effects(self, audio: np.ndarray, sr: int, 
                       config: Dict[str, Any]) -> np.ndarray:
@@ -122,6 +148,16 @@ class AudioProcessor:
             
         return processed
     
+    def _work_dtype(self, audio: np.ndarray) -> np.dtype:
+        """Float dtype effects should compute in (float32 input stays float32)."""
+        return np.result_type(audio.dtype, np.float32)
+    
+    def _sosfilt(self, sos: np.ndarray, audio: np.ndarray) -> np.ndarray:
+        """Apply an SOS filter without upcasting float32 audio to float64."""
+        # Always copy: the cached designs are read-only and sosfilt needs a
+        # writable buffer (it is only a few coefficients)
+        return scipy.signal.sosfilt(sos.astype(self._work_dtype(audio)), audio)
+    
     def _apply_noise_reduction(self, audio: np.ndarray) -> np.ndarray:
         """Apply noise reduction using spectral subtraction."""
         # Simple spectral subtraction
@@ -149,33 +185,41 @@ class AudioProcessor:
         # Simple 3-band EQ (low, mid, high)
         
         # Low shelf: boost bass slightly
-        sos_low = scipy.signal.butter(2, 200, btype='low', fs=sr, output='sos')
-        low_band = scipy.signal.sosfilt(sos_low, audio)
-        audio = audio + 0.1 * low_band  # 10% boost
+        sos_low = _butter_sos(2, 200, 'low', sr)
+        low_band = self._sosfilt(sos_low, audio)
+        low_band *= 0.1  # 10% boost
+        audio = audio + low_band  # new buffer; the caller's array is untouched
         
         # High shelf: add sparkle
-        sos_high = scipy.signal.butter(2, 8000, btype='high', fs=sr, output='sos')
-        high_band = scipy.signal.sosfilt(sos_high, audio)
-        audio = audio + 0.05 * high_band  # 5% boost
+        sos_high = _butter_sos(2, 8000, 'high', sr)
+        high_band = self._sosfilt(sos_high, audio)
+        high_band *= 0.05  # 5% boost
+        audio += high_band
         
         return audio
     
     def _apply_compression(self, audio: np.ndarray, 
                           threshold: float = -20.0, ratio: float = 4.0,
-                          attack: float = 0.003, release: float = 0.1) -> np.ndarray:
-        """Apply dynamic range compression."""
-        # Convert to dB
-        audio_db = 20 * np.log10(np.abs(audio) + 1e-10)
-        
-        # Apply compression curve
-        compressed_db = np.where(
-            audio_db > threshold,
-            threshold + (audio_db - threshold) / ratio,
-            audio_db
+                          attack: float = 0.003, release: float = 0.1,
+                          out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Apply dynamic range compression (into `out` if given; may be `audio`)."""
+        # Work in the linear domain: samples under the threshold pass through
+        # unchanged, so only the ones above it need the log/exp curve
+        threshold_lin = 10 ** (threshold / 20)
+        magnitude = np.abs(audio)
+        over = magnitude > threshold_lin
+        
+        # threshold + (dB - threshold) / ratio, converted back to linear, preserving sign
+        gained = np.sign(audio[over]) * threshold_lin * (
+            (magnitude[over] / threshold_lin) ** (1.0 / ratio)
         )
-        
-        # Convert back to linear, preserving sign
-        compressed_audio = np.sign(audio) * (10 ** (compressed_db / 20))
+        if out is None:
+            compressed_audio = audio.copy()
+        else:
+            compressed_audio = out
+            if out is not audio:
+                np.copyto(out, audio)
+        compressed_audio[over] = gained
         
         return compressed_audio
     
@@ -189,6 +233,7 @@ class AudioProcessor:
         impulse[0] = 1.0  # Dry signal
         
         # Apply convolution reverb
+        impulse = impulse.astype(self._work_dtype(audio), copy=False)
         reverb_audio = scipy.signal.fftconvolve(audio, impulse, mode='same')
         
         # Mix dry and wet signals
@@ -227,16 +272,12 @@ class AudioProcessor:
         
         return np.column_stack([new_left, new_right])
     
-    def _apply_limiter(self, audio: np.ndarray, threshold: float = -0.1) -> np.ndarray:
-        """Apply brickwall limiter to prevent clipping."""
-        # Convert to dB
-        audio_db = 20 * np.log10(np.abs(audio) + 1e-10)
-        
-        # Apply hard limiting
-        limited_db = np.minimum(audio_db, threshold)
-        
-        # Convert back to linear
-        limited_audio = np.sign(audio) * (10 ** (limited_db / 20))
+    def _apply_limiter(self, audio: np.ndarray, threshold: float = -0.1,
+                       out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Apply brickwall limiter to prevent clipping (into `out` if given; may be `audio`)."""
+        # Hard limiting at the threshold is a clip in the linear domain
+        threshold_lin = 10 ** (threshold / 20)
+        limited_audio = np.clip(audio, -threshold_lin, threshold_lin, out=out)
         
         return limited_audio
     
@@ -244,27 +285,28 @@ class AudioProcessor:
         """Apply mastering chain (EQ + compression + limiting)."""
         # Multi-band compression simulation
         # Low band
-        sos_low = scipy.signal.butter(4, 250, btype='low', fs=self.sample_rate, output='sos')
-        low = scipy.signal.sosfilt(sos_low, audio)
+        sos_low = _butter_sos(4, 250, 'low', self.sample_rate)
+        low = self._sosfilt(sos_low, audio)
         
         # Mid band
-        sos_mid = scipy.signal.butter(4, [250, 4000], btype='band', fs=self.sample_rate, output='sos')
-        mid = scipy.signal.sosfilt(sos_mid, audio)
+        sos_mid = _butter_sos(4, (250, 4000), 'band', self.sample_rate)
+        mid = self._sosfilt(sos_mid, audio)
         
         # High band
-        sos_high = scipy.signal.butter(4, 4000, btype='high', fs=self.sample_rate, output='sos')
-        high = scipy.signal.sosfilt(sos_high, audio)
+        sos_high = _butter_sos(4, 4000, 'high', self.sample_rate)
+        high = self._sosfilt(sos_high, audio)
         
-        # Gentle compression on each band
-        low_comp = self._apply_compression(low, threshold=-15, ratio=2.0)
-        mid_comp = self._apply_compression(mid, threshold=-12, ratio=3.0)
-        high_comp = self._apply_compression(high, threshold=-10, ratio=2.5)
+        # Gentle compression on each band (the band buffers are ours to overwrite)
+        low_comp = self._apply_compression(low, threshold=-15, ratio=2.0, out=low)
+        mid_comp = self._apply_compression(mid, threshold=-12, ratio=3.0, out=mid)
+        high_comp = self._apply_compression(high, threshold=-10, ratio=2.5, out=high)
         
         # Recombine
-        mastered = low_comp + mid_comp + high_comp
+        mastered = low_comp + mid_comp
+        mastered += high_comp
         
         # Final limiting
-        mastered = self._apply_limiter(mastered, threshold=-1.0)
+        mastered = self._apply_limiter(mastered, threshold=-1.0, out=mastered)
         
         return mastered
     
@@ -353,7 +395,8 @@ class AudioProcessor:
         )
         
         bitrate = settings.get('bitrate', '320k')
-        audio_segment.export(output_file, format="mp3", bitrate=bitrate)
+        audio_segment.export(output_file, format="mp3", bitrate=bitrate,
+                             parameters=self._ffmpeg_thread_args(settings))
     
 
 
@@ -387,7 +430,15 @@ class AudioProcessor:
         
         # pydub doesn't have 'quality' parameter for OGG, use bitrate instead
         bitrate = settings.get('bitrate', '128k')
-        audio_segment.export(output_file, format="ogg", bitrate=bitrate)
+        audio_segment.export(output_file, format="ogg", bitrate=bitrate,
+                             parameters=self._ffmpeg_thread_args(settings))
+    
+    def _ffmpeg_thread_args(self, settings: Dict[str, Any]) -> Optional[List[str]]:
+        """Build extra ffmpeg arguments for the optional 'threads' quality setting."""
+        threads = settings.get('threads')
+        if not threads:
+            return None
+        return ['-threads', str(int(threads))]
     
     def _save_wav(self, audio_data: np.ndarray, sr: int,
                   output_file: str, settings: Dict[str, Any]) -> None:
@@ -457,30 +508,34 @@ class AudioProcessor:
         analysis['sample_rate'] = sr
         analysis['channels'] = 1 if len(y.shape) == 1 else y.shape[1]
         
+        # One magnitude STFT shared by the spectral, beat and key analyses
+        S = np.abs(librosa.stft(y))
+        
         # Spectral analysis
-        analysis['spectral_analysis'] = self._spectral_analysis(y, sr)
+        analysis['spectral_analysis'] = self._spectral_analysis(y, sr, S)
         
         # Beat detection
-        analysis['beat_analysis'] = self._beat_detection(y, sr)
+        analysis['beat_analysis'] = self._beat_detection(y, sr, S)
         
         # Key detection
-        analysis['key_analysis'] = self._key_detection(y, sr)
+        analysis['key_analysis'] = self._key_detection(y, sr, S)
         
         # Loudness analysis
         analysis['loudness_analysis'] = self._loudness_analysis(y)
         
         return analysis
     
-    def _spectral_analysis(self, y: np.ndarray, sr: int) -> Dict[str, Any]:
-        """Perform spectral analysis."""
+    def _spectral_analysis(self, y: np.ndarray, sr: int,
+                           S: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """Perform spectral analysis (S: precomputed magnitude STFT of y)."""
         # Compute spectrogram
-        D = librosa.stft(y)
-        magnitude = np.abs(D)
+        if S is None:
+            S = np.abs(librosa.stft(y))
         
         # Spectral features
-        spectral_centroids = librosa.feature.spectral_centroid(y=y, sr=sr)[0]
-        spectral_rolloff = librosa.feature.spectral_rolloff(y=y, sr=sr)[0]
-        spectral_bandwidth = librosa.feature.spectral_bandwidth(y=y, sr=sr)[0]
+        spectral_centroids = librosa.feature.spectral_centroid(S=S, sr=sr)[0]
+        spectral_rolloff = librosa.feature.spectral_rolloff(S=S, sr=sr)[0]
+        spectral_bandwidth = librosa.feature.spectral_bandwidth(S=S, sr=sr)[0]
         
         # Zero crossing rate
         zcr = librosa.feature.zero_crossing_rate(y)[0]
@@ -496,11 +551,19 @@ class AudioProcessor:
             'zero_crossing_rate_std': float(np.std(zcr))
         }
     
-    def _beat_detection(self, y: np.ndarray, sr: int) -> Dict[str, Any]:
-        """Detect beat and tempo information."""
+    def _beat_detection(self, y: np.ndarray, sr: int,
+                        S: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """Detect beat and tempo information (S: precomputed magnitude STFT of y)."""
         try:
             # Compute beat track
-            tempo, beats = librosa.beat.beat_track(y=y, sr=sr)
+            if S is None:
+                tempo, beats = librosa.beat.beat_track(y=y, sr=sr)
+            else:
+                # Same log-power mel onset envelope (median-aggregated) that
+                # beat_track builds from y
+                mel_db = librosa.power_to_db(librosa.feature.melspectrogram(S=S ** 2, sr=sr))
+                onset_env = librosa.onset.onset_strength(S=mel_db, sr=sr, aggregate=np.median)
+                tempo, beats = librosa.beat.beat_track(onset_envelope=onset_env, sr=sr)
             
             return {
                 'tempo': float(tempo),
@@ -511,11 +574,15 @@ class AudioProcessor:
             warnings.warn(f"Beat detection failed: {e}")
             return {'tempo': 120.0, 'beat_count': 0, 'beat_positions': []}
     
-    def _key_detection(self, y: np.ndarray, sr: int) -> Dict[str, Any]:
-        """Detect musical key."""
+    def _key_detection(self, y: np.ndarray, sr: int,
+                       S: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """Detect musical key (S: precomputed magnitude STFT of y)."""
         try:
-            # Compute chromagram
-            chroma = librosa.feature.chroma_stft(y=y, sr=sr)
+            # Compute chromagram (chroma_stft expects a power spectrogram)
+            if S is None:
+                chroma = librosa.feature.chroma_stft(y=y, sr=sr)
+            else:
+                chroma = librosa.feature.chroma_stft(S=S ** 2, sr=sr)
             chroma_mean = np.mean(chroma, axis=1)
             
             # Key estimation (simplified)
@@ -545,6 +612,15 @@ class AudioProcessor:
             'peak_level': float(np.max(np.abs(y)))
         }
     
+    def _spectrogram_figure(self):
+        """Per-thread Figure for generate_spectrogram (OO API, not pyplot state)."""
+        fig = getattr(_plot_state, 'spectrogram_figure', None)
+        if fig is None:
+            from matplotlib.figure import Figure
+            fig = Figure(figsize=(12, 8))
+            _plot_state.spectrogram_figure = fig
+        return fig
+    
     def generate_spectrogram(self, audio_file: str, output_image: str) -> str:
         """
         Generate spectrogram visualization.
@@ -562,17 +638,26 @@ class AudioProcessor:
         # Compute spectrogram
         D = librosa.amplitude_to_db(np.abs(librosa.stft(y)), ref=np.max)
         
-        # Create plot
-        plt.figure(figsize=(12, 8))
-        librosa.display.specshow(D, sr=sr, x_axis='time', y_axis='hz')
-        plt.colorbar(format='%+2.0f dB')
-        plt.title('Spectrogram')
-        plt.xlabel('Time (s)')
-        plt.ylabel('Frequency (Hz)')
+        # Plotting modules are imported on first use; they are slow to load and
+        # only needed here
+        import librosa.display as librosa_display
         
-        # Save plot
-        plt.savefig(output_image, dpi=300, bbox_inches='tight')
-        plt.close()
+        # Create plot on this thread's reused figure (avoids per-call figure
+        # setup/teardown without sharing a figure between threads)
+        fig = self._spectrogram_figure()
+        try:
+            ax = fig.add_subplot()
+            img = librosa_display.specshow(D, sr=sr, x_axis='time', y_axis='hz', ax=ax)
+            fig.colorbar(img, ax=ax, format='%+2.0f dB')
+            ax.set_title('Spectrogram')
+            ax.set_xlabel('Time (s)')
+            ax.set_ylabel('Frequency (Hz)')
+
+            # Save plot
+            fig.savefig(output_image, dpi=300, bbox_inches='tight')
+        finally:
+            # Drop the artists (even after a failure), keeping the figure for the next call
+            fig.clear()
         
         return output_image
     
@@ -710,25 +795,38 @@ def process_audio_file(audio_file: str, output_dir: Optional[str] = None,
     )
     results['enhanced'] = enhanced_file
     
-    # Format conversions with default quality settings
+    # Format conversions and analysis are independent of each other, and the
+    # conversions mostly wait on ffmpeg subprocesses, so run them concurrently
     formats = ['mp3', 'flac', 'ogg']
-    for fmt in formats:
-        converted_file = processor.convert_format(
-            enhanced_file, 
-            output_format=fmt
-        )
-        results[f'{fmt}'] = converted_file
-    
+    # One worker per conversion plus one for the analysis
+    with ThreadPoolExecutor(max_workers=len(formats) + 1) as executor:
+        conversions = {
+            fmt: executor.submit(processor.convert_format, enhanced_file, output_format=fmt)
+            for fmt in formats
+        }
+        analysis_future = executor.submit(processor.analyze_audio, enhanced_file)
+
+        # Spectrogram is drawn on the calling thread meanwhile
+        spectrogram_file = str(Path(output_dir) / f"{Path(audio_file).stem}_spectrogram.png")
+        processor.generate_spectrogram(enhanced_file, spectrogram_file)
+
+        for fmt, future in conversions.items():
+            results[f'{fmt}'] = future.result()
+        analysis = analysis_future.result()
+
     # Audio analysis
-    analysis = processor.analyze_audio(enhanced_file)
     analysis_file = str(Path(output_dir) / f"{Path(audio_file).stem}_analysis.json")
-    with open(analysis_file, 'w') as f:
-        json.dump(analysis, f, indent=2)
+    if HAS_ORJSON:
+        # Serializes numpy scalars natively, no float() round-trips needed
+        Path(analysis_file).write_bytes(orjson.dumps(
+            analysis, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+        ))
+    else:
+        with open(analysis_file, 'w') as f:
+            json.dump(analysis, f, indent=2)
     results['analysis'] = analysis_file
     
     # Spectrogram
-    spectrogram_file = str(Path(output_dir) / f"{Path(audio_file).stem}_spectrogram.png")
-    processor.generate_spectrogram(enhanced_file, spectrogram_file)
     results['spectrogram'] = spectrogram_file
     
     return results
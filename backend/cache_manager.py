@@ -11,9 +11,20 @@ import json
 import os
 import time
 from pathlib import Path
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, Mapping, Optional, Tuple
 import threading
 from collections import OrderedDict
+from types import MappingProxyType
+
+
+# Shared read-only result for clear_cache() calls made without confirmation
+_CONFIRM_REQUIRED = MappingProxyType({
+    "success": False,
+    "message": "Clear operation cancelled - confirmation required",
+    "reason": "confirmation_required",
+    "files_cleared": 0,
+    "space_freed_mb": 0.0
+})
 
 
 class CacheManager:
@@ -43,6 +54,7 @@ class CacheManager:
 
         self.max_files = max_files
         self.max_size_bytes = max_size_mb * 1024 * 1024
+        self.max_size_mb = self.max_size_bytes / (1024 * 1024)
         self.cache_ttl = 3600  # 1 hour TTL
 
         # Thread-safe data structures
@@ -62,6 +74,11 @@ class CacheManager:
             "popular_moods_cached": []
         }
 
+        # Short-lived snapshot of get_stats() so back-to-back readers
+        # (formatted stats, health report, UI panels) share one computation
+        self.stats_cache_ttl = 0.5  # seconds
+        self._stats_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+
         # Load existing cache index
         self._load_cache_index()
 
@@ -117,10 +134,13 @@ class CacheManager:
         Returns:
             MD5 hash string as cache key
         """
-        # Create a deterministic string from prompt and sorted params
+        # Create a deterministic string from prompt and sorted params.
+        # The key format and MD5 digest are kept stable so existing cache
+        # entries stay addressable; usedforsecurity=False keeps MD5 usable on
+        # FIPS-restricted builds, where it would otherwise raise.
         param_str = json.dumps(params, sort_keys=True)
         key_string = f"{prompt}|{param_str}"
-        return hashlib.md5(key_string.encode()).hexdigest()
+        return hashlib.md5(key_string.encode(), usedforsecurity=False).hexdigest()
 
     def get(self, cache_key: str) -> Optional[Tuple[str, Dict[str, Any]]]:
         """
@@ -133,6 +153,7 @@ class CacheManager:
             Tuple of (file_path, metadata) if found, None otherwise
         """
         with self._lock:
+            self._invalidate_stats()
             self._stats["total_requests"] += 1
 
             if cache_key in self._cache_index:
@@ -174,6 +195,7 @@ class CacheManager:
             metadata: Metadata dictionary containing prompt, params, etc.
         """
         with self._lock:
+            self._invalidate_stats()
             cache_file = self.cache_dir / f"{cache_key}.wav"
 
             # Copy audio file to cache
@@ -249,6 +271,10 @@ class CacheManager:
             Dictionary containing detailed cache statistics
         """
         with self._lock:
+            cached = self._stats_cache
+            if cached is not None and time.monotonic() - cached[0] < self.stats_cache_ttl:
+                return self._copy_stats(cached[1])
+
             stats = self._stats.copy()
             stats["hit_rate"] = (stats["hits"] / stats["total_requests"]) if stats["total_requests"] > 0 else 0.0
             stats["cache_size_mb"] = stats["cache_size_bytes"] / (1024 * 1024)
@@ -264,7 +290,18 @@ class CacheManager:
             stats["efficiency_score"] = self._calculate_efficiency_score()
             stats["warming_effectiveness"] = self._calculate_warming_effectiveness()
             
-            return stats
+            self._stats_cache = (time.monotonic(), stats)
+            return self._copy_stats(stats)
+
+    @staticmethod
+    def _copy_stats(stats: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy a stats dict including its nested lists/dicts, so callers never share them."""
+        return {key: value.copy() if isinstance(value, (list, dict)) else value
+                for key, value in stats.items()}
+
+    def _invalidate_stats(self) -> None:
+        """Drop the get_stats() snapshot; call before mutating the index or stats."""
+        self._stats_cache = None
     
     def _calculate_efficiency_score(self) -> float:
         """Calculate cache efficiency score (0-100)."""
@@ -287,35 +324,51 @@ class CacheManager:
         warming_hit_rate = total_warming_hits / self._stats["total_requests"]
         return min(100.0, warming_hit_rate * 100)
     
-    def get_formatted_stats(self) -> str:
-        """Get formatted cache statistics for display."""
-        stats = self.get_stats()
-        
+    def get_formatted_stats(self, max_chars: Optional[int] = None) -> str:
+        """
+        Get formatted cache statistics for display.
+
+        Args:
+            max_chars: Stop formatting once this many characters are produced
+                and truncate to it (None for the full report)
+        """
+        return self._format_stats(self.get_stats(), max_chars)
+
+    def _format_stats(self, stats: Dict[str, Any], max_chars: Optional[int] = None) -> str:
+        """Render a get_stats() dictionary as display text."""
         formatted = []
-        formatted.append("📊 CACHE STATISTICS")
-        formatted.append("=" * 50)
-        formatted.append(f"📈 Hit Rate: {stats['hit_rate']:.1%}")
-        formatted.append(f"💾 Storage Used: {stats['cache_size_mb']:.1f} MB / {self.max_size_bytes / (1024*1024):.0f} MB ({stats['storage_usage_percent']:.1f}%)")
-        formatted.append(f"📁 Files Cached: {len(self._cache_index)} / {self.max_files} ({stats['files_usage_percent']:.1f}%)")
-        formatted.append(f"⚡ Efficiency Score: {stats['efficiency_score']:.1f}/100")
-        formatted.append(f"🔥 Cache Warming Effectiveness: {stats['warming_effectiveness']:.1f}%")
-        formatted.append(f"✅ Cache Hits: {stats['hits']}")
-        formatted.append(f"❌ Cache Misses: {stats['misses']}")
-        formatted.append(f"🔄 Evictions: {stats['evictions']}")
-        formatted.append("")
+        length = 0
+        for line in self._iter_stat_lines(stats):
+            formatted.append(line)
+            length += len(line) + 1
+            if max_chars is not None and length > max_chars:
+                break
+        return "\n".join(formatted)[:max_chars]
+
+    def _iter_stat_lines(self, stats: Dict[str, Any]):
+        """Yield the display lines for a get_stats() dictionary."""
+        yield "📊 CACHE STATISTICS"
+        yield "=" * 50
+        yield f"📈 Hit Rate: {stats['hit_rate']:.1%}"
+        yield f"💾 Storage Used: {stats['cache_size_mb']:.1f} MB / {self.max_size_mb:.0f} MB ({stats['storage_usage_percent']:.1f}%)"
+        yield f"📁 Files Cached: {len(self._cache_index)} / {self.max_files} ({stats['files_usage_percent']:.1f}%)"
+        yield f"⚡ Efficiency Score: {stats['efficiency_score']:.1f}/100"
+        yield f"🔥 Cache Warming Effectiveness: {stats['warming_effectiveness']:.1f}%"
+        yield f"✅ Cache Hits: {stats['hits']}"
+        yield f"❌ Cache Misses: {stats['misses']}"
+        yield f"🔄 Evictions: {stats['evictions']}"
+        yield ""
         
         # Top cached prompts
         if stats["top_cached_prompts"]:
-            formatted.append("🎵 TOP CACHED PROMPTS:")
-            formatted.append("-" * 30)
+            yield "🎵 TOP CACHED PROMPTS:"
+            yield "-" * 30
             for i, (prompt, count) in enumerate(stats["top_cached_prompts"][:5], 1):
                 short_prompt = prompt[:60] + "..." if len(prompt) > 60 else prompt
-                formatted.append(f"{i}. {short_prompt} ({count} times)")
-        
-        return "\n".join(formatted)
+                yield f"{i}. {short_prompt} ({count} times)"
 
 
-    def clear_cache(self, confirm: bool = False) -> Dict[str, Any]:
+    def clear_cache(self, confirm: bool = False) -> Mapping[str, Any]:
         """
         Clear all cached files and reset statistics.
         
@@ -323,17 +376,13 @@ class CacheManager:
             confirm: If True, perform clear operation
             
         Returns:
-            Dictionary with operation results
+            Dictionary with operation results (read-only when not confirmed)
         """
         if not confirm:
-            return {
-                "success": False,
-                "message": "Clear operation cancelled - confirmation required",
-                "files_cleared": 0,
-                "space_freed_mb": 0.0
-            }
+            return _CONFIRM_REQUIRED
             
         with self._lock:
+            self._invalidate_stats()
             files_cleared = 0
             space_freed = 0
             
@@ -379,6 +428,7 @@ class CacheManager:
             Dictionary with operation results
         """
         with self._lock:
+            self._invalidate_stats()
             files_cleared = 0
             space_freed = 0
             current_time = time.time()
@@ -567,6 +617,7 @@ class CacheManager:
             Dictionary with detailed validation results
         """
         with self._lock:
+            self._invalidate_stats()
             validation_results = {
                 "validation_time": time.time(),
                 "total_entries": len(self._cache_index),
@@ -580,6 +631,12 @@ class CacheManager:
                 "recommendations": []
             }
             
+            # Nothing to walk or re-save for an empty index
+            if not self._cache_index:
+                self._stats["files_cached"] = 0
+                validation_results["recommendations"].append("Cache is empty - consider warming cache with popular prompts")
+                return validation_results
+            
             current_time = time.time()
             
             for cache_key, entry in list(self._cache_index.items()):
@@ -671,7 +728,10 @@ class CacheManager:
         """
         stats = self.get_stats()
         validation = self.validate_cache(clean_expired=False, fix_corruption=True)
-        
+        return self._build_health_report(stats, validation)
+
+    def _build_health_report(self, stats: Dict[str, Any], validation: Dict[str, Any]) -> Dict[str, Any]:
+        """Score cache health from already-collected stats and validation results."""
         health_score = 100.0
         health_issues = []
         
@@ -711,6 +771,35 @@ class CacheManager:
             "recommendations": validation["recommendations"]
         }
 
+    def snapshot(self, clean_expired: bool = False) -> Dict[str, Any]:
+        """
+        Collect stats, health, validation and formatted stats in one go.
+
+        The index is walked once by validate_cache(); the health report and
+        formatted text are derived from that result instead of re-validating.
+        Stats are taken before validation, as get_cache_health_report() does.
+
+        With the default clean_expired=False, "health" matches
+        get_cache_health_report(). With clean_expired=True it differs: the
+        entries validation just removed are still counted as expired, so the
+        score can carry the "Many expired entries" penalty.
+
+        Args:
+            clean_expired: Passed to validate_cache(); remove expired entries
+
+        Returns:
+            Dictionary with "stats", "health", "validation" and "formatted" keys
+        """
+        with self._lock:
+            stats = self.get_stats()
+            validation = self.validate_cache(clean_expired=clean_expired, fix_corruption=True)
+            return {
+                "stats": stats,
+                "health": self._build_health_report(stats, validation),
+                "validation": validation,
+                "formatted": self._format_stats(stats)
+            }
+
     def __del__(self):
         """Save cache index on destruction."""
         try:
@@ -721,10 +810,13 @@ class CacheManager:
 
 # Global cache manager instance
 _cache_manager_instance = None
+_cache_manager_lock = threading.Lock()
 
 def get_cache_manager() -> CacheManager:
     """Get the global cache manager instance."""
     global _cache_manager_instance
     if _cache_manager_instance is None:
-        _cache_manager_instance = CacheManager()
+        with _cache_manager_lock:
+            if _cache_manager_instance is None:
+                _cache_manager_instance = CacheManager()
     return _cache_manager_instance
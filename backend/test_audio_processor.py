@@ -50,11 +50,12 @@ class TestAudioProcessor(unittest.TestCase):
         frequency = 440  # A4 note
         
         t = np.linspace(0, duration, int(sample_rate * duration))
-        audio = 0.3 * np.sin(2 * np.pi * frequency * t)
+        two_pi_t = 2 * np.pi * t
+        audio = 0.3 * np.sin(two_pi_t * frequency)
         
         # Add some harmonics for more complex signal
-        audio += 0.1 * np.sin(2 * np.pi * frequency * 2 * t)
-        audio += 0.05 * np.sin(2 * np.pi * frequency * 3 * t)
+        audio += 0.1 * np.sin(two_pi_t * (frequency * 2))
+        audio += 0.05 * np.sin(two_pi_t * (frequency * 3))
         
         # Save as test file
         test_file = os.path.join(self.temp_dir, "test_audio.wav")
@@ -111,7 +112,7 @@ class TestAudioProcessor(unittest.TestCase):
         result = self.processor.convert_format(
             self.test_audio_file,
             'mp3',
-            quality_settings={'bitrate': '128k'}
+            quality_settings={'bitrate': '128k', 'threads': os.cpu_count()}
         )
         
         self.assertTrue(os.path.exists(result))
@@ -124,7 +125,7 @@ class TestAudioProcessor(unittest.TestCase):
         result = self.processor.convert_format(
             self.test_audio_file,
             'flac',
-            quality_settings={'compression_level': 3}
+            quality_settings={'compression_level': 3, 'threads': os.cpu_count()}
         )
         
         self.assertTrue(os.path.exists(result))
@@ -138,7 +139,7 @@ class TestAudioProcessor(unittest.TestCase):
         result = self.processor.convert_format(
             self.test_audio_file,
             'ogg',
-            quality_settings={'bitrate': '128k'}
+            quality_settings={'bitrate': '128k', 'threads': os.cpu_count()}
         )
         
         self.assertTrue(os.path.exists(result))
@@ -199,6 +200,20 @@ class TestAudioProcessor(unittest.TestCase):
         # Check file size is reasonable (should be > 0)
         self.assertGreater(os.path.getsize(result), 1000)
     
+    def test_spectrogram_failed_save_clears_figure(self):
+        """Test a failed save does not leave axes on the reused figure."""
+        bad_image = os.path.join(self.temp_dir, "missing_dir", "spectrogram.png")
+        
+        with self.assertRaises(Exception):
+            self.processor.generate_spectrogram(self.test_audio_file, bad_image)
+        self.assertEqual(len(self.processor._spectrogram_figure().axes), 0)
+        
+        # The next render starts from a clean figure
+        output_image = os.path.join(self.temp_dir, "spectrogram.png")
+        self.processor.generate_spectrogram(self.test_audio_file, output_image)
+        self.assertGreater(os.path.getsize(output_image), 1000)
+        self.assertEqual(len(self.processor._spectrogram_figure().axes), 0)
+    
     def test_process_audio_file_full_pipeline(self):
         """Test complete audio processing pipeline."""
         results = process_audio_file(
@@ -240,6 +255,95 @@ class TestAudioProcessor(unittest.TestCase):
         limited = self.processor._apply_limiter(audio_data.copy())
         self.assertEqual(len(limited), len(audio_data))
     
+    def _mixed_level_signal(self):
+        """Mono and stereo float64 test signals with samples above and below -20/-0.1 dB."""
+        rng = np.random.default_rng(0)
+        mono = rng.uniform(-1.5, 1.5, 4000)
+        mono[:100] = rng.uniform(-0.05, 0.05, 100)  # well below threshold
+        mono[100] = 0.0
+        stereo = rng.uniform(-1.5, 1.5, (2000, 2))
+        return mono, stereo
+    
+    def test_compression_matches_db_formula(self):
+        """Test the linear-domain compressor against the dB-domain formula."""
+        for audio in self._mixed_level_signal():
+            for threshold, ratio in [(-20.0, 4.0), (-12.0, 3.0)]:
+                audio_db = 20 * np.log10(np.abs(audio) + 1e-10)
+                expected_db = np.where(audio_db > threshold,
+                                       threshold + (audio_db - threshold) / ratio,
+                                       audio_db)
+                expected = np.sign(audio) * (10 ** (expected_db / 20))
+                
+                compressed = self.processor._apply_compression(audio, threshold=threshold, ratio=ratio)
+                self.assertEqual(compressed.shape, audio.shape)
+                np.testing.assert_allclose(compressed, expected, rtol=1e-7, atol=1e-9)
+    
+    def test_limiter_matches_db_formula(self):
+        """Test the clip-based limiter against the dB-domain formula."""
+        for audio in self._mixed_level_signal():
+            for threshold in (-0.1, -1.0):
+                audio_db = 20 * np.log10(np.abs(audio) + 1e-10)
+                expected = np.sign(audio) * (10 ** (np.minimum(audio_db, threshold) / 20))
+                
+                limited = self.processor._apply_limiter(audio, threshold=threshold)
+                self.assertEqual(limited.shape, audio.shape)
+                np.testing.assert_allclose(limited, expected, rtol=1e-7, atol=1e-9)
+    
+    def test_compression_limiter_out_in_place(self):
+        """Test out=audio writes in place and returns the same array."""
+        for audio in self._mixed_level_signal():
+            expected = self.processor._apply_compression(audio)
+            x = audio.copy()
+            result = self.processor._apply_compression(x, out=x)
+            self.assertIs(result, x)
+            np.testing.assert_array_equal(x, expected)
+            
+            expected = self.processor._apply_limiter(audio)
+            x = audio.copy()
+            result = self.processor._apply_limiter(x, out=x)
+            self.assertIs(result, x)
+            np.testing.assert_array_equal(x, expected)
+    
+    def test_compression_limiter_separate_out(self):
+        """Test a separate out buffer receives the result and the input is untouched."""
+        for audio in self._mixed_level_signal():
+            original = audio.copy()
+            
+            buf = np.empty_like(audio)
+            result = self.processor._apply_compression(audio, out=buf)
+            self.assertIs(result, buf)
+            np.testing.assert_array_equal(buf, self.processor._apply_compression(original))
+            np.testing.assert_array_equal(audio, original)
+            
+            buf = np.empty_like(audio)
+            result = self.processor._apply_limiter(audio, out=buf)
+            self.assertIs(result, buf)
+            np.testing.assert_array_equal(buf, self.processor._apply_limiter(original))
+            np.testing.assert_array_equal(audio, original)
+    
+    def test_filter_effects_leave_input_unchanged(self):
+        """Test EQ and mastering do not modify the caller's array."""
+        audio_data = self._load_audio_data(self.test_audio_file)
+        original = audio_data.copy()
+        
+        self.processor._apply_eq_adjustment(audio_data, 32000)
+        np.testing.assert_array_equal(audio_data, original)
+        
+        self.processor._apply_mastering(audio_data)
+        np.testing.assert_array_equal(audio_data, original)
+    
+    def test_filter_effects_float64(self):
+        """Test EQ and mastering on float64 audio (cached filter designs are read-only)."""
+        audio_data = self._load_audio_data(self.test_audio_file).astype(np.float64)
+        
+        eq_adjusted = self.processor._apply_eq_adjustment(audio_data.copy(), 32000)
+        self.assertEqual(len(eq_adjusted), len(audio_data))
+        self.assertEqual(eq_adjusted.dtype, np.float64)
+        
+        mastered = self.processor._apply_mastering(audio_data.copy())
+        self.assertEqual(len(mastered), len(audio_data))
+        self.assertEqual(mastered.dtype, np.float64)
+    
     def test_default_effects_config(self):
         """Test default effects configuration."""
         config = self.processor._get_default_effects_config()
@@ -267,9 +371,9 @@ class TestAudioProcessor(unittest.TestCase):
         self.assertEqual(output_path, expected)
     
     def _load_audio_data(self, file_path):
-        """Helper to load audio data."""
+        """Helper to load audio data as float32 (half the memory of the float64 default)."""
         import soundfile as sf
-        data, _ = sf.read(file_path)
+        data, _ = sf.read(file_path, dtype='float32', always_2d=False)
         return data
 
 
@@ -327,24 +431,32 @@ def create_test_audio_samples():
         'complex': {'type': 'mixed', 'duration': 3.0}
     }
     
+    # Time vectors keyed by duration - most sample types share the same one
+    t_cache = {}
+    
     for name, params in sample_types.items():
         # Generate audio
         sample_rate = 32000
-        t = np.linspace(0, params['duration'], int(sample_rate * params['duration']))
+        duration = params['duration']
+        if duration not in t_cache:
+            t_cache[duration] = np.linspace(0, duration, int(sample_rate * duration),
+                                            dtype=np.float32)
+        t = t_cache[duration]
+        two_pi_t = 2 * np.pi * t
         
         if name == 'sine_wave':
-            audio = 0.3 * np.sin(2 * np.pi * params['freq'] * t)
+            audio = 0.3 * np.sin(two_pi_t * params['freq'])
 
         elif name == 'chord':
             audio = np.zeros_like(t)
             for freq in params['freqs']:
-                audio += 0.1 * np.sin(2 * np.pi * freq * t)
+                audio += 0.1 * np.sin(two_pi_t * freq)
         elif name == 'noise':
             audio = 0.1 * np.random.normal(0, 1, len(t))
         elif name == 'complex':
             # Mix of different elements
-            audio = (0.2 * np.sin(2 * np.pi * 220 * t) + 
-                    0.1 * np.sin(2 * np.pi * 440 * t) +
+            audio = (0.2 * np.sin(two_pi_t * 220) + 
+                    0.1 * np.sin(two_pi_t * 440) +
                     0.05 * np.random.normal(0, 1, len(t)))
         
         # Save file
@@ -364,12 +476,19 @@ if __name__ == "__main__":
     print("Creating test audio samples...")
     test_audio_dir = create_test_audio_samples()
     
-    # Run unit tests
-    unittest.main(verbosity=2, exit=False)
+    # Run unit tests - spread across CPUs with pytest-xdist when it is installed
+    try:
+        import pytest
+        import xdist  # noqa: F401
+    except ImportError:
+        unittest.main(verbosity=2, exit=False)
+    else:
+        pytest.main([__file__, "-v", "-n", "auto"])
     
     print(f"\n✅ Test audio samples created in: {test_audio_dir}")
     print("📁 You can use these files for manual testing:")
     
-    import glob
-    for audio_file in glob.glob(os.path.join(test_audio_dir, "*.wav")):
-        print(f"   • {os.path.basename(audio_file)}")
+    with os.scandir(test_audio_dir) as entries:
+        for entry in entries:
+            if entry.name.endswith(".wav"):
+                print(f"   • {entry.name}")
@@ -15,6 +15,9 @@ prompts = [
     "Funky groove with bass and drums"
 ]
 
+# Reruns don't regenerate: generate_music() already memoizes on disk through
+# backend.cache_manager (keyed by prompt + duration + model) and copies the
+# cached wav to the requested output on a hit.
 for i, p in enumerate(prompts, 1):
     filename = f"test_{i}.wav"
     print("\nGenerating:", p)
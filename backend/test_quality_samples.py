@@ -12,6 +12,13 @@ import time
 import json
 from pathlib import Path
 
+# Optional dependencies - handle gracefully if not available
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -137,16 +144,23 @@ def main():
 
     # Save detailed results
     output_file = output_dir / f"quality_test_results_{int(time.time())}.json"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump({
-            "test_info": {
-                "timestamp": time.time(),
-                "quality_threshold": scorer.config.min_overall_score,
-                "total_samples": len(SAMPLE_PROMPTS)
-            },
-            "summary": summary_stats,
-            "results": results
-        }, f, indent=2, ensure_ascii=False)
+    payload = {
+        "test_info": {
+            "timestamp": time.time(),
+            "quality_threshold": scorer.config.min_overall_score,
+            "total_samples": len(SAMPLE_PROMPTS)
+        },
+        "summary": summary_stats,
+        "results": results
+    }
+    if HAS_ORJSON:
+        # orjson writes UTF-8 bytes directly and handles numpy scalars in the reports
+        output_file.write_bytes(orjson.dumps(
+            payload, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+        ))
+    else:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, indent=2, ensure_ascii=False)
 
     print(f"📊 Detailed results saved to: {output_file}")
     print()
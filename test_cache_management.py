@@ -152,6 +152,81 @@ def test_enhanced_features():
         print(f"❌ Enhanced features test failed: {e}")
         return False
 
+def test_stats_snapshot_invalidation():
+    """Test that get_stats() sees get()/set() made within the stats cache TTL."""
+    print("\n" + "=" * 60)
+    print("TESTING STATS SNAPSHOT INVALIDATION")
+    print("=" * 60)
+    
+    import os
+    import shutil
+    import tempfile
+    from backend.cache_manager import CacheManager
+    
+    cache_dir = tempfile.mkdtemp()
+    try:
+        cache_manager = CacheManager(cache_dir=cache_dir)
+        cache_manager.stats_cache_ttl = 60  # keep the snapshot alive for the whole test
+        before = cache_manager.get_stats()
+        
+        audio_file = os.path.join(cache_dir, "source.wav")
+        with open(audio_file, "wb") as f:
+            f.write(b"RIFF" + b"\0" * 1024)
+        prompt = "snapshot invalidation test"
+        cache_key = cache_manager.get_cache_key(prompt, {"duration": 8})
+        
+        cache_manager.set(cache_key, audio_file, {"prompt": prompt})
+        after_set = cache_manager.get_stats()
+        assert after_set["files_cached"] == before["files_cached"] + 1
+        assert after_set["cache_size_bytes"] > before["cache_size_bytes"]
+        
+        assert cache_manager.get(cache_key) is not None
+        after_get = cache_manager.get_stats()
+        assert after_get["hits"] == before["hits"] + 1
+        assert after_get["total_requests"] == before["total_requests"] + 1
+        print("✅ get_stats() reflects set() and get() inside the TTL")
+        
+        # Each caller gets its own nested containers
+        after_get["top_cached_prompts"].append(("leaked", 0))
+        after_get["most_cached_prompts"]["leaked"] = 0
+        fresh = cache_manager.get_stats()
+        assert ("leaked", 0) not in fresh["top_cached_prompts"]
+        assert "leaked" not in fresh["most_cached_prompts"]
+        print("✅ Cached stats are not shared between callers")
+        
+        return True
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+def test_formatted_stats_truncation():
+    """Test that get_formatted_stats(max_chars=n) equals the full text cut at n."""
+    print("\n" + "=" * 60)
+    print("TESTING FORMATTED STATS TRUNCATION")
+    print("=" * 60)
+    
+    import shutil
+    import tempfile
+    from backend.cache_manager import CacheManager
+    
+    cache_dir = tempfile.mkdtemp()
+    try:
+        cache_manager = CacheManager(cache_dir=cache_dir)
+        # Populate top prompts, including one long enough to be shortened
+        cache_manager._stats["most_cached_prompts"] = {
+            "calm piano": 5, "upbeat electronic dance track": 3, "x" * 80: 2
+        }
+        cache_manager._invalidate_stats()
+        
+        full = cache_manager.get_formatted_stats()
+        assert "TOP CACHED PROMPTS" in full
+        for n in range(len(full) + 2):
+            assert cache_manager.get_formatted_stats(max_chars=n) == full[:n], n
+        print(f"✅ Truncation matches slicing for all {len(full) + 2} limits")
+        
+        return True
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
 def main():
     """Main test function."""
     print("🎵 COMPREHENSIVE CACHE MANAGEMENT TEST")
@@ -162,7 +237,9 @@ def main():
         ("Cache Statistics", test_cache_statistics),
         ("Cache Management", test_cache_management), 
         ("Cache Integration", test_cache_integration),
-        ("Enhanced Features", test_enhanced_features)
+        ("Enhanced Features", test_enhanced_features),
+        ("Stats Snapshot Invalidation", test_stats_snapshot_invalidation),
+        ("Formatted Stats Truncation", test_formatted_stats_truncation)
     ]
     
     results = []
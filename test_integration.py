@@ -3,106 +3,195 @@
 Test cache integration with generation pipeline without actual music generation.
 """
 
+import contextlib
+import json
+import os
+import sys
+from functools import lru_cache
+from types import SimpleNamespace
+
+# Machine-readable mode: one JSON object per test on stdout, e.g.
+#   python test_integration.py --json | jq '.ok'
+JSON_OUT = "--json" in sys.argv
+
+
+@lru_cache(maxsize=1)
+def _backend():
+    """Import the pipeline modules once (backend.generate pulls in torch)."""
+    from backend.cache_manager import get_cache_manager
+    from backend.generate import generate_music
+    from backend.full_pipeline import run_music_pipeline
+    return SimpleNamespace(
+        get_cache_manager=get_cache_manager,
+        generate_music=generate_music,
+        run_music_pipeline=run_music_pipeline
+    )
+
+def _flush(out, result=None):
+    """Write the buffered report lines (or the JSON result) with a single stdout call."""
+    if JSON_OUT:
+        out.clear()
+        if result is not None:
+            sys.__stdout__.write(json.dumps(result) + "\n")
+    elif out:
+        sys.stdout.write("\n".join(str(line) for line in out) + "\n")
+        out.clear()
+
+def _record_traceback(out, result):
+    """With AIMUSIC_DEBUG set, keep the current traceback with the report it belongs to."""
+    if os.environ.get("AIMUSIC_DEBUG"):
+        import traceback
+        tb = traceback.format_exc().rstrip()
+        out.append(tb)
+        result["traceback"] = tb
+
 def test_pipeline_integration():
     """Test that cache statistics are properly integrated into the pipeline."""
-    print("🔗 TESTING PIPELINE INTEGRATION")
-    print("=" * 50)
+    # Collect report lines and write them in one go at the end
+    out = ["🔗 TESTING PIPELINE INTEGRATION", "=" * 50]
+    result = {"test": "pipeline_integration", "ok": False}
     
     try:
         # Test imports
-        from backend.cache_manager import get_cache_manager
-        from backend.generate import generate_music
-        from backend.full_pipeline import run_music_pipeline
-        print("✅ All pipeline imports: SUCCESS")
+        backend = _backend()
+        out.append("✅ All pipeline imports: SUCCESS")
         
         # Test cache manager access from generate module
-        cache_manager = get_cache_manager()
-        print("✅ Cache manager access from generate: SUCCESS")
+        cache_manager = backend.get_cache_manager()
+        out.append("✅ Cache manager access from generate: SUCCESS")
         
         # Test cache stats display function
-        stats_display = cache_manager.get_formatted_stats()
-        print("✅ Cache statistics display: SUCCESS")
+        stats_display = cache_manager.get_formatted_stats(max_chars=200)
+        out.append("✅ Cache statistics display: SUCCESS")
         
         # Test health report generation
         health = cache_manager.get_cache_health_report()
-        print("✅ Cache health report: SUCCESS")
+        out.append("✅ Cache health report: SUCCESS")
         
         # Verify integration points exist
-        print("\n📋 INTEGRATION VERIFICATION:")
-        print("   ✅ Cache statistics displayed after generation")
-        print("   ✅ Health report shown in pipeline completion")
-        print("   ✅ Recommendations provided to users")
-        print("   ✅ Cache warming for popular moods")
-        print("   ✅ Efficient cache key generation")
-        print("   ✅ LRU eviction policy active")
+        out.append("\n📋 INTEGRATION VERIFICATION:")
+        out.append("   ✅ Cache statistics displayed after generation")
+        out.append("   ✅ Health report shown in pipeline completion")
+        out.append("   ✅ Recommendations provided to users")
+        out.append("   ✅ Cache warming for popular moods")
+        out.append("   ✅ Efficient cache key generation")
+        out.append("   ✅ LRU eviction policy active")
         
         # Show sample output format
-        print("\n📊 SAMPLE OUTPUT FORMAT:")
-        print("-" * 40)
-        print(stats_display[:200] + "...")
-        print("-" * 40)
+        divider = "-" * 40
+        out.append("\n📊 SAMPLE OUTPUT FORMAT:")
+        out.append(divider)
+        out.append(stats_display + "...")
+        out.append(divider)
         
-        print("\n🏥 SAMPLE HEALTH REPORT:")
-        print("-" * 40)
-        print(f"Health Score: {health['overall_health_score']:.1f}/100")
-        print(f"Status: {health['health_status']}")
+        out.append("\n🏥 SAMPLE HEALTH REPORT:")
+        out.append(divider)
+        out.append(f"Health Score: {health['overall_health_score']:.1f}/100")
+        out.append(f"Status: {health['health_status']}")
         if health['health_issues']:
-            print("Issues:", ", ".join(health['health_issues']))
-        print("-" * 40)
+            out.append("Issues: " + ", ".join(health['health_issues']))
+        out.append(divider)
         
+        result.update(ok=True,
+                      health_score=health['overall_health_score'],
+                      health_status=health['health_status'],
+                      health_issues=health['health_issues'])
         return True
         
     except Exception as e:
-        print(f"❌ Integration test failed: {e}")
-        import traceback
-        traceback.print_exc()
+        out.append(f"❌ Integration test failed: {type(e).__name__}: {e}")
+        result["error"] = f"{type(e).__name__}: {e}"
+        _record_traceback(out, result)
         return False
+    finally:
+        _flush(out, result)
 
 def test_user_interface_features():
     """Test user-facing cache management features."""
-    print("\n🖥️  TESTING USER INTERFACE FEATURES")
-    print("=" * 50)
+    out = ["\n🖥️  TESTING USER INTERFACE FEATURES", "=" * 50]
+    result = {"test": "user_interface_features", "ok": False}
     
     try:
         from backend.cache_manager import get_cache_manager
         cache_manager = get_cache_manager()
         
-        # Test user-friendly statistics
-        stats = cache_manager.get_stats()
-        formatted_stats = cache_manager.get_formatted_stats()
+        # Test management operations (run first so the snapshot below
+        # validates the cache as it is after them)
+        clear_result = cache_manager.clear_cache(confirm=False)
+        selective_clear = cache_manager.selective_clear(older_than_hours=24)
         
-        print("✅ User-friendly statistics: SUCCESS")
-        print(f"   Hit rate: {stats['hit_rate']:.1%} ({stats['hits']} hits, {stats['misses']} misses)")
-        print(f"   Storage: {stats['cache_size_mb']:.1f} MB / {cache_manager.max_size_bytes / (1024*1024):.0f} MB")
-        print(f"   Files: {len(cache_manager._cache_index)} / {cache_manager.max_files}")
-        print(f"   Efficiency: {stats['efficiency_score']:.1f}/100")
+        # Stats, formatted stats and validation from a single index pass
+        snap = cache_manager.snapshot(clean_expired=True)
+        stats = snap['stats']
+        formatted_stats = snap['formatted']
+        idx_len = len(cache_manager._cache_index)
+        max_mb = cache_manager.max_size_mb
+        hit_pct = round(stats['hit_rate'] * 1000) / 10
+        size_mb = round(stats['cache_size_mb'], 1)
+        efficiency = round(stats['efficiency_score'], 1)
         
-        # Test management operations
-        clear_result = cache_manager.clear_cache(confirm=False)
-        print("✅ Safe clear operation: SUCCESS")
-        print(f"   Confirmation required: {not clear_result['success']}")
+        out.append("✅ User-friendly statistics: SUCCESS")
+        out.append(f"   Hit rate: {hit_pct:.1f}% ({stats['hits']} hits, {stats['misses']} misses)")
+        out.append(f"   Storage: {size_mb:.1f} MB / {max_mb:.0f} MB")
+        out.append(f"   Files: {idx_len} / {cache_manager.max_files}")
+        out.append(f"   Efficiency: {efficiency:.1f}/100")
         
-        selective_clear = cache_manager.selective_clear(older_than_hours=24)
-        print("✅ Selective clear operation: SUCCESS")
+        out.append("✅ Safe clear operation: SUCCESS")
+        out.append(f"   Confirmation required: {not clear_result['success']}")
+        out.append("✅ Selective clear operation: SUCCESS")
         
         # Test validation features
-        validation = cache_manager.validate_cache()
-        print("✅ Cache validation: SUCCESS")
-        print(f"   Valid entries: {validation['valid_entries']}")
-        print(f"   Recommendations: {len(validation.get('recommendations', []))}")
+        validation = snap['validation']
+        out.append("✅ Cache validation: SUCCESS")
+        out.append(f"   Valid entries: {validation['valid_entries']}")
+        out.append(f"   Recommendations: {len(validation.get('recommendations', []))}")
         
+        result.update(ok=True,
+                      hit_rate=stats['hit_rate'],
+                      files=idx_len,
+                      efficiency_score=stats['efficiency_score'],
+                      valid_entries=validation['valid_entries'])
         return True
         
     except Exception as e:
-        print(f"❌ UI features test failed: {e}")
+        out.append(f"❌ UI features test failed: {type(e).__name__}: {e}")
+        result["error"] = f"{type(e).__name__}: {e}"
+        _record_traceback(out, result)
         return False
+    finally:
+        _flush(out, result)
+
+def _exit_code(success1, success2):
+    """Exit status bits: 1 = pipeline integration failed, 2 = UI features failed."""
+    rc = 0
+    rc |= 0 if success1 else 1
+    rc |= 0 if success2 else 2
+    return rc
+
+def _run_tests():
+    """
+    Run both tests one after the other, pipeline first as it always has.
+
+    The UI test is destructive (selective_clear and an expiring validation
+    remove entries from the shared cache manager), so it runs last. That way
+    the pipeline test's stats and health report describe the cache as found.
+    Each test flushes its own report, so the output keeps the same order.
+    """
+    success1 = test_pipeline_integration()
+    success2 = test_user_interface_features()
+    return success1, success2
 
 if __name__ == "__main__":
+    if JSON_OUT:
+        # Keep backend log chatter off stdout so it stays valid JSON lines
+        with contextlib.redirect_stdout(sys.stderr):
+            success1, success2 = _run_tests()
+        sys.exit(_exit_code(success1, success2))
+    
     print("🎵 CACHE PIPELINE INTEGRATION TEST")
     print("Testing integration with music generation pipeline...\n")
     
-    success1 = test_pipeline_integration()
-    success2 = test_user_interface_features()
+    success1, success2 = _run_tests()
     
     print("\n" + "=" * 50)
     if success1 and success2:
@@ -119,3 +208,4 @@ if __name__ == "__main__":
     else:
         print("❌ Some integration issues detected")
     print("=" * 50)
+    sys.exit(_exit_code(success1, success2))